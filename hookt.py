@@ -1,36 +1,75 @@
-from wrapt import ObjectProxy
-from abc import ABC, abstractmethod
+from functools import update_wrapper
+from weakref import WeakKeyDictionary
 
-from anyio import create_task_group
+from anyio import create_event, create_task_group, sleep
 
 __all__ = ["BaseTrigger", "Trigger", "TriggerGroup", "HooksMixin", "trigger", "on"]
 
-class BaseTrigger(ABC, ObjectProxy):
-    """Trigger base class."""
+DEFAULT_MAX_BATCH = 64
+
+class BaseTrigger:
+    """Trigger base class.
+
+    The name, docstring and module of the wrapped function are copied onto the trigger,
+    and other attributes that are not defined on the trigger are looked up on it.
+    """
+
+    __slots__ = ("__wrapped__", "__dict__", "_self_listeners", "_self_batch", "_self_splat")
+
+    def __init__(self, func, batch=None, splat=None):
+        update_wrapper(self, func)
+        self._self_batch = batch
+        self._self_splat = splat
+
+
+    def __getattr__(self, name):
+        if name == "__wrapped__":
+            raise AttributeError(name)
+        return getattr(self.__wrapped__, name)
+
 
     @property
-    @abstractmethod
     def listeners(self):
-        """Set of listeners."""
-        pass
+        """List of listeners."""
+        raise NotImplementedError
 
 
-    @abstractmethod
     def hook(self, callback):
         """Register a callback.
 
         :param callback: asynchronous function that take as input the result of the trigger
         :type callback: function
         """
-        pass
+        raise NotImplementedError
 
 
     async def __call__(self, *args, **kwargs):
+        """Call the wrapped function, then the listeners with its result.
+
+        A trigger with at most one listener never yields to the event loop itself;
+        it only suspends where the wrapped function or the listener does.
+        """
         r = await self.__wrapped__(*args, **kwargs)
-        s = r if type(r) is tuple else (r,)
+        # read the slot rather than the listeners property on every call
+        listeners = self._self_listeners
+        if not listeners:
+            return r
+        if self._self_batch is not None:
+            await self._self_batch.submit(listeners, r)
+            return r
+        splat = self._self_splat
+        if splat is None:
+            splat = type(r) is tuple
+        if len(listeners) == 1:
+            await (listeners[0](*r) if splat else listeners[0](r))
+            return r
         async with create_task_group() as tg:
-            for f in self.listeners:
-                await tg.spawn(f, *s)
+            if splat:
+                for f in listeners:
+                    await tg.spawn(f, *r)
+            else:
+                for f in listeners:
+                    await tg.spawn(f, r)
         return r
 
 
@@ -38,8 +77,11 @@ class BaseTrigger(ABC, ObjectProxy):
 class DummyTrigger(BaseTrigger):
     """Dummy trigger for internal use"""
 
+    __slots__ = ()
+
     def __init__(self):
-        self._listeners = set()
+        super().__init__(None)
+        self._self_listeners = []
 
 
     def __get__(self, instance, owner):
@@ -48,11 +90,12 @@ class DummyTrigger(BaseTrigger):
 
     @property
     def listeners(self):
-        return self._listeners
+        return self._self_listeners
 
 
     def hook(self, callback):
-        self._listeners.add(callback)
+        if callback not in self._self_listeners:
+            self._self_listeners.append(callback)
 
 
     async def __call__(self):
@@ -65,30 +108,45 @@ class Trigger(BaseTrigger):
 
     :param func: the function to set as trigger
     :type func: function
-    :param listeners: a set of listeners, defaults to None
-    :type listeners: set, optional
+    :param listeners: a list of listeners, defaults to None
+    :type listeners: list, optional
+    :param batched: call listeners once with a list of the results of concurrent calls,
+        defaults to False; calls are coalesced per bound trigger, so calls on instances
+        without a ``__dict__`` each get their own queue
+    :type batched: bool, optional
+    :param max_batch: maximum number of results passed to listeners at once,
+        defaults to ``DEFAULT_MAX_BATCH``
+    :type max_batch: int, optional
+    :raises ValueError: raised when batched and max_batch is less than 1
+    :param splat: whether results are unpacked as listener arguments, defaults to None,
+        in which case functions annotated to return a tuple are always unpacked and the
+        result is checked on every call otherwise
+    :type splat: bool, optional
     """
 
-    def __init__(self, func, listeners=None):
-        super().__init__(func)
-        self._self_listeners = listeners or set()
+    __slots__ = ("_self_instance_listeners", "_self_strong_listeners")
+
+    def __init__(self, func, listeners=None, batched=False, max_batch=DEFAULT_MAX_BATCH,
+                 splat=None):
+        if batched and max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        if splat is None and _returns_tuple(func):
+            splat = True
+        super().__init__(func, Batch(max_batch) if batched else None, splat)
+        self._self_listeners = [] if listeners is None else listeners
         self._self_instance_listeners = None
+        self._self_strong_listeners = None
 
 
     def __get__(self, instance, owner):
         if not instance:
             return self
 
-        if not self._self_instance_listeners:
-            self._self_instance_listeners = {instance: set()}
-
-        elif instance not in self._self_instance_listeners:
-            self._self_instance_listeners[instance] = set()
-
         return BoundTrigger(
+            trigger = self,
             func = self.__wrapped__.__get__(instance, owner),
-            listeners = self._self_instance_listeners[instance],
-            class_listeners = self._self_listeners
+            listeners = self._instance_listeners(instance),
+            batch = None if self._self_batch is None else Batch(self._self_batch.max_batch)
         )
 
 
@@ -98,29 +156,61 @@ class Trigger(BaseTrigger):
         :param callback: asynchronous function that takes as input the result of the trigger
         :type callback: function
         """
-        if instance or owner:
-            self.__get__(instance, owner or type(instance)).hook(callback)
-        else:
-            self._self_listeners.add(callback)
+        if instance:
+            listeners = self._instance_listeners(instance)
+            if callback not in listeners:
+                listeners.append(callback)
+        elif callback not in self._self_listeners:
+            self._self_listeners.append(callback)
+            for instances in (self._self_instance_listeners, self._self_strong_listeners):
+                if instances:
+                    for listeners in instances.values():
+                        if callback not in listeners:
+                            listeners.append(callback)
 
 
     @property
     def listeners(self):
-        """Set of listeners"""
+        """List of listeners"""
         return self._self_listeners
 
 
+    def _instance_listeners(self, instance):
+        if type(instance).__weakrefoffset__:
+            if self._self_instance_listeners is None:
+                self._self_instance_listeners = WeakKeyDictionary()
+            instances = self._self_instance_listeners
+        else:
+            # instances that cannot be weakly referenced are kept alive with their listeners
+            if self._self_strong_listeners is None:
+                self._self_strong_listeners = {}
+            instances = self._self_strong_listeners
+
+        listeners = instances.get(instance)
+        if listeners is None:
+            instances[instance] = listeners = list(self._self_listeners)
+
+        return listeners
+
+
 
 class BoundTrigger(BaseTrigger):
     """A trigger bound to an instance.
 
     This class should not be created directly in normal circumstances.
+    The listeners of a bound trigger already include those of its class trigger.
     """
 
-    def __init__(self, func, listeners, class_listeners):
-        super().__init__(func)
+    __slots__ = ("_self_trigger",)
+
+    def __init__(self, trigger, func, listeners, batch=None):
+        self._self_trigger = trigger
+        # share the attributes the class trigger copied from the wrapped function
+        self.__dict__ = trigger.__dict__
+        self.__wrapped__ = func
         self._self_listeners = listeners
-        self._self_class_listeners = class_listeners
+        self._self_batch = batch
+        self._self_splat = trigger._self_splat
 
 
     def __get__(self, instance, owner):
@@ -129,11 +219,86 @@ class BoundTrigger(BaseTrigger):
 
     @property
     def listeners(self):
-        return self._self_listeners | self._self_class_listeners
+        return self._self_listeners
 
 
     def hook(self, callback):
-        self._self_listeners.add(callback)
+        if callback not in self._self_listeners:
+            self._self_listeners.append(callback)
+
+
+
+class Batch:
+    """Queue coalescing the results of concurrent calls to a batched trigger.
+
+    The first caller to find the queue idle drains it, calling the listeners once
+    per batch of at most ``max_batch`` results, while the other callers wait for
+    their batch to be delivered. An exception raised by a listener is raised in
+    every caller whose result was in that batch.
+
+    This class should not be created directly in normal circumstances.
+    """
+
+    __slots__ = ("max_batch", "_pending", "_draining")
+
+    def __init__(self, max_batch):
+        self.max_batch = max_batch
+        self._pending = []
+        self._draining = False
+
+
+    async def submit(self, listeners, r):
+        # an item is [result, wakeup event, delivered, error]
+        item = [r, None, False, None]
+        self._pending.append(item)
+        while self._draining:
+            item[1] = create_event()
+            try:
+                await item[1].wait()
+            except BaseException:
+                if not item[2]:
+                    self._withdraw(item)
+                    # pass on a handover this caller can no longer take
+                    if not self._draining and self._pending:
+                        await self._pending[0][1].set()
+                raise
+            if item[2]:
+                if item[3] is not None:
+                    raise item[3]
+                return
+
+        self._draining = True
+        try:
+            # let concurrent callers enqueue before the first batch is taken
+            await sleep(0)
+            while self._pending:
+                items = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                try:
+                    await _notify(listeners, [i[0] for i in items])
+                except Exception as e:
+                    for i in items:
+                        i[3] = e
+                finally:
+                    for i in items:
+                        i[2] = True
+                        if i[1] is not None:
+                            await i[1].set()
+        finally:
+            self._draining = False
+            # the drainer was cancelled: hand the remaining items over to one of their callers
+            if self._pending:
+                await self._pending[0][1].set()
+
+        if item[3] is not None:
+            raise item[3]
+
+
+    def _withdraw(self, item):
+        for n, i in enumerate(self._pending):
+            if i is item:
+                del self._pending[n]
+                return
 
 
 
@@ -168,23 +333,36 @@ class TriggerGroup(object):
         return self._hashed_hooks.__setitem__(key, value)
 
 
-    def trigger(self, name):
+    def get(self, key, default=None):
+        """Get a trigger by name.
+
+        :param key: the name of the trigger
+        :type key: str
+        :param default: returned when no trigger has that name, defaults to None
+        """
+        return self._hashed_hooks.get(key, default)
+
+
+    def trigger(self, name, batched=False, max_batch=DEFAULT_MAX_BATCH, splat=None):
         """Decorate an asynchronous function as a named trigger.
 
         :param name: the name of the trigger.
         :type name: str
+        :param batched: see :class:`Trigger`, defaults to False
+        :type batched: bool, optional
+        :param max_batch: see :class:`Trigger`, defaults to ``DEFAULT_MAX_BATCH``
+        :type max_batch: int, optional
+        :param splat: see :class:`Trigger`, defaults to None
+        :type splat: bool, optional
         :raises ValueError: raised when the name is already defined for another trigger.
         """
         def deco(f):
-            if name in self._hashed_hooks:
-                h = self._hashed_hooks[name]
-                if isinstance(h, Trigger):
-                    raise ValueError(f'Trigger "{name}" already defined')
-                elif isinstance(h, DummyTrigger):
-                    f = Trigger(f, h.listeners)
-            else:
-                self._hashed_hooks[name] = f = Trigger(f)
-            return f
+            h = self._hashed_hooks.get(name)
+            if isinstance(h, Trigger):
+                raise ValueError(f'Trigger "{name}" already defined')
+            listeners = h.listeners if isinstance(h, DummyTrigger) else None
+            self._hashed_hooks[name] = t = Trigger(f, listeners, batched, max_batch, splat)
+            return t
         return deco
 
 
@@ -197,10 +375,9 @@ class TriggerGroup(object):
         :param name: the name of the trigger to be hooked on
         :type name: str
         """
-        if name not in self._hashed_hooks:
+        h = self._hashed_hooks.get(name)
+        if h is None:
             self._hashed_hooks[name] = h = DummyTrigger()
-        else:
-            h = self._hashed_hooks[name]
 
         return on(h, instance, owner)
 
@@ -216,6 +393,7 @@ class BoundTriggerGroup(TriggerGroup):
         self.instance = instance
         self.owner = owner
         self._hashed_hooks = hashed_hooks
+        self._bound_triggers = None
 
 
     def __get__(self, instance, owner):
@@ -223,7 +401,30 @@ class BoundTriggerGroup(TriggerGroup):
 
 
     def __getitem__(self, key):
-        return super().__getitem__(key).__get__(self.instance, self.owner)
+        return self._bind(key, super().__getitem__(key))
+
+
+    def get(self, key, default=None):
+        h = super().get(key)
+        if h is None:
+            return default
+        return self._bind(key, h)
+
+
+    def _bind(self, key, h):
+        if not isinstance(h, Trigger):
+            return h.__get__(self.instance, self.owner)
+
+        if self._bound_triggers is None:
+            self._bound_triggers = {}
+        else:
+            bound = self._bound_triggers.get(key)
+            # the group may have been given another trigger under the same name
+            if bound is not None and bound._self_trigger is h:
+                return bound
+
+        self._bound_triggers[key] = bound = h.__get__(self.instance, self.owner)
+        return bound
 
 
     def on(self, name, instance=None, owner=None):
@@ -243,8 +444,8 @@ class HooksMixin:
 
     hooks = None
 
-    def trigger(self, name):
-        return self.hooks.trigger(name)
+    def trigger(self, name, batched=False, max_batch=DEFAULT_MAX_BATCH, splat=None):
+        return self.hooks.trigger(name, batched, max_batch, splat)
 
 
     def on(self, name):
@@ -252,6 +453,24 @@ class HooksMixin:
 
 
 
+def _returns_tuple(func):
+    r = getattr(func, "__annotations__", {}).get("return")
+    if isinstance(r, str):
+        return r.partition("[")[0].strip() in ("tuple", "Tuple", "typing.Tuple")
+    return r is tuple or getattr(r, "__origin__", None) is tuple
+
+
+async def _notify(listeners, r):
+    if not listeners:
+        return
+    if len(listeners) == 1:
+        await listeners[0](r)
+        return
+    async with create_task_group() as tg:
+        for f in listeners:
+            await tg.spawn(f, r)
+
+
 def trigger(f):
     """Create a trigger from an asynchronous function.
 
@@ -269,6 +488,13 @@ def on(t, instance=None, owner=None):
     :param t: the trigger to register the function on
     :type t: class:`Trigger`
     """
+    if isinstance(t, Trigger):
+        # register on the instance directly, without binding the trigger
+        def deco(f):
+            t.hook(f, instance, owner)
+            return f
+        return deco
+
     if instance or owner:
         t = t.__get__(instance, owner or type(instance))
 
@@ -1,5 +1,5 @@
-from hookt import on, trigger
-from anyio import sleep
+from hookt import Trigger, on, trigger
+from anyio import create_event, create_task_group, fail_after, sleep, wait_all_tasks_blocked
 
 import pytest
 
@@ -20,3 +20,155 @@ async def test_function():
     result = None
 
     assert await identity(Ellipsis) == result
+
+
+@pytest.mark.anyio
+async def test_batched():
+
+    async def identity(arg):
+        return arg
+
+    batched = Trigger(identity, batched=True, max_batch=4)
+
+    @on(batched)
+    async def capture(captured_outputs):
+        batches.append(captured_outputs)
+
+    batches = []
+
+    async with create_task_group() as tg:
+        for i in range(10):
+            await tg.spawn(batched, i)
+
+    assert sorted(r for b in batches for r in b) == list(range(10))
+    assert all(len(b) <= 4 for b in batches)
+    assert len(batches) < 10
+
+    with pytest.raises(ValueError):
+        Trigger(identity, batched=True, max_batch=0)
+
+    Trigger(identity, max_batch=0)
+
+
+@pytest.mark.anyio
+async def test_splat():
+
+    @trigger
+    async def pair(a, b) -> tuple:
+        return a, b
+
+    @on(pair)
+    async def capture(a, b):
+        nonlocal result
+        result = a + b
+
+    result = None
+    await pair(1, 2)
+    assert result == 3
+
+    async def identity(arg):
+        return arg
+
+    whole = Trigger(identity, splat=False)
+
+    @on(whole)
+    async def capture_whole(captured_output):
+        nonlocal result
+        result = captured_output
+
+    await whole((1, 2))
+    assert result == (1, 2)
+
+
+@pytest.mark.anyio
+async def test_no_yield():
+
+    @trigger
+    async def identity(arg):
+        return arg
+
+    @on(identity)
+    async def capture(captured_output):
+        pass
+
+    async def other():
+        nonlocal ran
+        ran = True
+
+    ran = False
+
+    async with create_task_group() as tg:
+        await tg.spawn(other)
+        await identity(Ellipsis)
+        assert not ran
+
+
+def test_wrapper_attributes():
+
+    async def identity(arg):
+        """Return arg."""
+        return arg
+
+    t = trigger(identity)
+
+    assert t.__name__ == "identity"
+    assert t.__qualname__ == identity.__qualname__
+    assert t.__doc__ == "Return arg."
+    assert t.__module__ == __name__
+
+
+@pytest.mark.anyio
+async def test_batched_errors():
+
+    async def identity(arg):
+        return arg
+
+    batched = Trigger(identity, batched=True, max_batch=1)
+    release = create_event()
+
+    @on(batched)
+    async def capture(captured_outputs):
+        if captured_outputs == ["a"]:
+            await release.wait()
+            raise RuntimeError
+
+    async def call(arg):
+        try:
+            await batched(arg)
+        except RuntimeError:
+            results[arg] = "error"
+        else:
+            results[arg] = "ok"
+
+    results = {}
+
+    async with fail_after(1):
+        async with create_task_group() as tg:
+            await tg.spawn(call, "a")
+            async with create_task_group() as cancelled:
+                await cancelled.spawn(call, "b")
+                await tg.spawn(call, "c")
+                await wait_all_tasks_blocked()
+                await cancelled.cancel_scope.cancel()
+            await release.set()
+
+    assert results == {"a": "error", "c": "ok"}
+
+    failing = Trigger(identity, batched=True)
+
+    @on(failing)
+    async def fail(captured_outputs):
+        raise RuntimeError
+
+    async def call_failing(arg):
+        with pytest.raises(RuntimeError):
+            await failing(arg)
+        raised.append(arg)
+
+    raised = []
+
+    async with create_task_group() as tg:
+        await tg.spawn(call_failing, "x")
+        await tg.spawn(call_failing, "y")
+
+    assert sorted(raised) == ["x", "y"]
@@ -1,7 +1,25 @@
-from hookt import TriggerGroup, HooksMixin
+from hookt import Trigger, TriggerGroup, HooksMixin, on, trigger
 from anyio import sleep
 
+import copy
+import pickle
 import pytest
+import weakref
+
+
+class Plain:
+
+    @trigger
+    async def identity(self, arg):
+        return arg
+
+
+class Grouped(HooksMixin):
+    hooks = TriggerGroup()
+
+    @hooks.trigger("ident")
+    async def identity(self, arg):
+        return arg
 
 
 @pytest.mark.anyio
@@ -25,3 +43,286 @@ async def test_function():
     result = None
 
     assert await sample.identity(Ellipsis) == result
+
+
+@pytest.mark.anyio
+async def test_class_and_instance_listeners():
+
+    class Sample(HooksMixin):
+        hooks = TriggerGroup()
+
+        @hooks.trigger("ident")
+        async def identity(self, arg):
+            return arg
+
+    sample = Sample()
+    other = Sample()
+    calls = []
+
+    @sample.on("ident")
+    async def capture_instance(captured_output):
+        calls.append(("instance", captured_output))
+
+    @Sample.hooks.on("ident")
+    async def capture_class(captured_output):
+        calls.append(("class", captured_output))
+
+    await sample.identity(1)
+    await other.identity(2)
+
+    assert sorted(calls) == [("class", 1), ("class", 2), ("instance", 1)]
+
+
+def test_instances_released():
+
+    class Sample(HooksMixin):
+        hooks = TriggerGroup()
+
+        @hooks.trigger("ident")
+        async def identity(self, arg):
+            return arg
+
+    sample = Sample()
+
+    @sample.on("ident")
+    async def capture(captured_output):
+        pass
+
+    ref = weakref.ref(sample)
+    del sample
+
+    assert ref() is None
+
+
+@pytest.mark.anyio
+async def test_hook_before_trigger():
+    hooks = TriggerGroup()
+
+    @hooks.on("ident")
+    async def capture_early(captured_output):
+        calls.append("early")
+
+    @hooks.trigger("ident")
+    async def identity(arg):
+        return arg
+
+    @hooks.on("ident")
+    async def capture_late(captured_output):
+        calls.append("late")
+
+    calls = []
+
+    assert hooks["ident"] is identity
+    await identity(Ellipsis)
+    assert calls == ["early", "late"]
+
+    with pytest.raises(ValueError):
+        hooks.trigger("ident")(identity)
+
+
+@pytest.mark.anyio
+async def test_copied_instance():
+
+    class Sample(HooksMixin):
+        hooks = TriggerGroup()
+
+        def __init__(self, value):
+            self.value = value
+
+        @hooks.trigger("ident")
+        async def identity(self, arg):
+            return self.value, arg
+
+    sample = Sample(1)
+    assert await sample.identity("x") == (1, "x")
+    assert sample.hooks.instance is sample
+
+    other = copy.copy(sample)
+    other.value = 2
+
+    assert await other.identity("x") == (2, "x")
+    assert other.hooks.instance is other
+
+    @other.on("ident")
+    async def capture(captured_output):
+        nonlocal result
+        result = captured_output
+
+    result = None
+
+    await sample.identity("x")
+    assert result is None
+
+
+@pytest.mark.anyio
+async def test_slotted_instance():
+
+    class Sample:
+        __slots__ = ()
+
+        @trigger
+        async def identity(self, arg):
+            return arg
+
+    sample = Sample()
+
+    @on(Sample.identity, sample)
+    async def capture(captured_output):
+        nonlocal result
+        result = captured_output
+
+    result = None
+
+    assert await sample.identity(Ellipsis) == result
+
+
+@pytest.mark.anyio
+async def test_replaced_trigger():
+
+    class Sample(HooksMixin):
+        hooks = TriggerGroup()
+
+        @hooks.trigger("ident")
+        async def identity(self, arg):
+            return "old"
+
+    async def replacement(self, arg):
+        return "new"
+
+    sample = Sample()
+    assert await sample.hooks["ident"](Ellipsis) == "old"
+
+    Sample.hooks["ident"] = Trigger(replacement)
+
+    assert await sample.hooks["ident"](Ellipsis) == "new"
+    assert await sample.hooks.get("ident")(Ellipsis) == "new"
+
+    hooks = sample.hooks
+    assert await hooks["ident"](Ellipsis) == "new"
+
+    batched = Trigger(replacement, batched=True)
+    Sample.hooks["ident"] = batched
+
+    @on(batched)
+    async def capture(captured_outputs):
+        nonlocal result
+        result = captured_outputs
+
+    result = None
+
+    await hooks["ident"](Ellipsis)
+    assert result == ["new"]
+
+    Sample.hooks["ident"] = replacement
+    assert await hooks["ident"](Ellipsis) == "new"
+
+
+def test_bound_wrapper_attributes():
+
+    class Sample(HooksMixin):
+        hooks = TriggerGroup()
+
+        @hooks.trigger("ident")
+        async def identity(self, arg):
+            """Return arg."""
+            return arg
+
+    bound = Sample.identity.__get__(Sample(), Sample)
+
+    assert bound.__name__ == "identity"
+    assert bound.__doc__ == "Return arg."
+    assert bound.__module__ == __name__
+
+
+@pytest.mark.anyio
+async def test_instance_state():
+    calls = []
+
+    @on(Plain.identity)
+    async def capture_class(captured_output):
+        calls.append(("cls", captured_output))
+
+    sample = Plain()
+
+    @on(Plain.identity, sample)
+    async def capture_instance(captured_output):
+        calls.append(("instance", captured_output))
+
+    await sample.identity(1)
+    assert vars(sample) == {}
+    assert type(pickle.loads(pickle.dumps(sample))) is Plain
+
+    other = copy.deepcopy(sample)
+
+    @on(Plain.identity)
+    async def capture_late(captured_output):
+        calls.append(("late", captured_output))
+
+    calls.clear()
+    await other.identity(2)
+    assert sorted(calls) == [("cls", 2), ("late", 2)]
+
+
+def test_late_assignment():
+
+    class Sample:
+        pass
+
+    async def identity(self, arg):
+        return arg
+
+    Sample.identity = Trigger(identity)
+    sample = Sample()
+    sample.identity = 5
+
+    assert sample.identity == 5
+
+
+@pytest.mark.anyio
+async def test_named_splat():
+
+    class Sample(HooksMixin):
+        hooks = TriggerGroup()
+
+        @hooks.trigger("pair", splat=False)
+        async def pair(self, a, b) -> tuple:
+            return a, b
+
+    sample = Sample()
+
+    @sample.on("pair")
+    async def capture(captured_output):
+        nonlocal result
+        result = captured_output
+
+    result = None
+
+    await sample.pair(1, 2)
+    assert result == (1, 2)
+
+
+@pytest.mark.anyio
+async def test_group_instance_state():
+    sample = Grouped()
+
+    @sample.on("ident")
+    async def capture(captured_output):
+        pass
+
+    await sample.hooks["ident"](1)
+
+    assert vars(sample) == {}
+    assert type(pickle.loads(pickle.dumps(sample))) is Grouped
+    assert copy.deepcopy(sample).hooks.instance is not sample
+
+
+def test_group_late_assignment():
+
+    class Sample(HooksMixin):
+        pass
+
+    Sample.hooks = TriggerGroup()
+    sample = Sample()
+    sample.hooks = None
+
+    assert sample.hooks is None